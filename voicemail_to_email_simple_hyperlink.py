@@ -57,6 +57,11 @@ Your Lambda execution role needs these permissions:
             "Action": ["s3:GetObject", "s3:HeadObject"],
             "Resource": "arn:aws:s3:::YOUR-BUCKET/*"
         },
+        {
+            "Effect": "Allow",
+            "Action": "s3:ListBucket",
+            "Resource": "arn:aws:s3:::YOUR-BUCKET"
+        },
         {
             "Effect": "Allow",
             "Action": ["transcribe:StartTranscriptionJob", "transcribe:GetTranscriptionJob"],
@@ -64,7 +69,7 @@ Your Lambda execution role needs these permissions:
         },
         {
             "Effect": "Allow",
-            "Action": "ses:SendEmail",
+            "Action": ["ses:SendEmail", "ses:SendBulkEmail"],
             "Resource": "*"
         },
         {
@@ -104,11 +109,16 @@ In your Amazon Connect contact flow:
 
 2. Add "Set contact attributes" block
    - Destination key: emailRecipient
-   - Value: support@company.com (or dynamic value)
+   - Value: support@company.com (or dynamic value; comma-separate
+     multiple addresses)
    
    (Optional)
    - Destination key: RecipientName
    - Value: Support Team
+   
+   (Optional)
+   - Destination key: SkipTranscription
+   - Value: true (email the link without transcribing)
 
 3. Add "Invoke AWS Lambda function" block
    - Select this Lambda function
@@ -152,6 +162,45 @@ Required:
 Optional (with defaults):
     URL_EXPIRATION: Link expiration in seconds (default: 604800 = 7 days)
     RECORDING_WAIT_TIME: Wait time for recording upload (default: 70 seconds)
+    LOG_LEVEL: Logging level, e.g. WARNING in production (default: INFO)
+    LOG_BUFFER_SIZE: Buffer up to this many log records and write them in
+                     batches; errors and the end of each invocation flush
+                     the buffer (default: 0 = unbuffered)
+
+Optional (deferred processing):
+    ASYNC_PROCESSING: Set to "true" to acknowledge the Connect invocation
+                      immediately and finish processing in an asynchronous
+                      invocation of this function, keeping the contact flow
+                      well inside its Lambda timeout. Needs
+                      lambda:InvokeFunction on this function.
+    SCHEDULER_ROLE_ARN: Role EventBridge Scheduler assumes to invoke this
+                        function (lambda:InvokeFunction). When set, the wait
+                        for the recording is scheduled instead of slept
+                        through. The Lambda role also needs
+                        scheduler:CreateSchedule and iam:PassRole on it.
+    CONTACT_TABLE: DynamoDB table (partition key "InitialContactId", string;
+                   TTL attribute "expiresAt") for event-driven processing.
+                   When set, the Connect invocation registers the contact
+                   and returns; an S3 event notification (s3:ObjectCreated:*,
+                   prefix "<prefix>/ivr/", suffix ".wav") on the recordings
+                   bucket invokes this function once the recording lands.
+                   Needs dynamodb:PutItem and dynamodb:DeleteItem. With
+                   SCHEDULER_ROLE_ARN also set, a fallback search runs
+                   RECORDING_WAIT_TIME + 120 seconds later for contacts no
+                   upload event has claimed, and contacts whose processing
+                   fails are registered again and retried the same way.
+    MAIL_QUEUE_URL: SQS queue for email delivery. When set, composed emails
+                    are queued (sqs:SendMessage) instead of sent inline.
+                    Subscribe this function to the queue with BatchSize=10,
+                    MaximumBatchingWindowInSeconds=1 and
+                    ReportBatchItemFailures enabled so it drains the queue
+                    at the SES sending rate.
+
+Optional packages:
+    orjson: Faster transcript JSON parsing when bundled with the function
+            or provided by a layer; the standard json module is used otherwise
+    ijson:  Streams the transcript and keeps only the sections the preview
+            uses, lowering peak memory for long voicemails
 
 ================================================================================
 AMAZON CONNECT REQUIREMENTS
@@ -159,8 +208,9 @@ AMAZON CONNECT REQUIREMENTS
 
 Your contact flow must:
     1. Enable call recording (Set recording behavior block)
-    2. Set "emailRecipient" attribute (REQUIRED)
+    2. Set "emailRecipient" attribute (REQUIRED, comma-separated for several)
     3. Set "RecipientName" attribute (optional, defaults to email)
+       Set "SkipTranscription" to "true" to skip transcription (optional)
     4. Invoke this Lambda function after recording
 
 Event structure Lambda receives:
@@ -172,6 +222,7 @@ Event structure Lambda receives:
                     "Address": "+18607866359"            ← Caller number
                 },
                 "InstanceARN": "arn:aws:connect:...",    ← Determines region
+                "InitiationTimestamp": "2024-12-11T...", ← Optional, narrows search
                 "Attributes": {
                     "emailRecipient": "user@example.com", ← REQUIRED
                     "RecipientName": "John Smith"         ← Optional
@@ -204,30 +255,87 @@ Security:
 """
 
 import os
+import re
+import base64
 import json
 import boto3
 import logging
+import logging.handlers
+import atexit
 import time
+import calendar
 import hmac
 import hashlib
-import urllib.request
-from datetime import datetime, timedelta
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from functools import lru_cache
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from botocore.exceptions import ClientError
-from botocore.config import Config
-from urllib.parse import quote, unquote
+from urllib.parse import quote, unquote, unquote_plus, urlsplit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Logging
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+# Optionally buffer records and hand them to the runtime's handler in batches;
+# errors flush immediately, but lines still buffered when an invocation times out are lost
+_log_buffer: Optional[logging.handlers.MemoryHandler] = None
+_log_buffer_size = int(os.environ.get("LOG_BUFFER_SIZE", "0") or 0)
+if _log_buffer_size > 0 and logger.handlers:
+    _log_target = logger.handlers[0]
+    _log_buffer = logging.handlers.MemoryHandler(_log_buffer_size, flushLevel=logging.ERROR, target=_log_target)
+    logger.removeHandler(_log_target)
+    logger.addHandler(_log_buffer)
+    atexit.register(_log_buffer.flush)
 
 # Constants
 DEFAULT_LANGUAGE = "en-US"
 DEFAULT_PREVIEW_LEN = 700
 DEFAULT_MODE = "channel"
 TRANSCRIBE_MAX_WAIT_SECS = 600
-TRANSCRIBE_POLL_SECS = 3
+TRANSCRIBE_POLL_INITIAL_SECS = 1.0
+TRANSCRIBE_POLL_MAX_SECS = 10.0
+TRANSCRIBE_POLL_BACKOFF = 1.5
 MAX_TIME_WINDOW_MINUTES = 5
+INITIATION_WINDOW_MINUTES = 1
+SCHEDULED_EVENT_SOURCE = "voicemail.scheduled"
+ASYNC_PROCESS_TASK = "process"
+CONTACT_TTL_SECS = 86400
+CONTACT_FALLBACK_GRACE_SECS = 120
+TRANSCRIPT_RESULT_FIELDS = ("transcripts", "items", "channel_labels", "speaker_labels")
+_SEP = "=" * 80
+
+# Stray space before punctuation in joined transcript words
+_PUNCT_FIX = re.compile(r" ([,.!?;:])")
+
+# S3 HTTPS endpoints: path-style s3.<region>.amazonaws.com and virtual-hosted <bucket>.s3.<region>.amazonaws.com
+_S3_PATH_HOST = re.compile(r"^s3[.-]([a-z0-9-]+\.)?amazonaws\.com$")
+_S3_VIRTUAL_HOST = re.compile(r"^(.+)\.s3[.-]([a-z0-9-]+\.)?amazonaws\.com$")
+
+# Recording location is fixed per container; validate_environment reports a missing BASE_PATH
+_BUCKET, _, _PREFIX = os.environ.get("BASE_PATH", "").strip("/").partition("/")
+
+# Signing secret is read once per container so the hot path skips the encode
+_SIGNING_SECRET = os.environ.get("SIGNING_SECRET", "")
+_SIGNING_SECRET_BYTES = _SIGNING_SECRET.encode()
+_HMAC_PROTO = hmac.new(_SIGNING_SECRET_BYTES, digestmod=hashlib.sha256) if _SIGNING_SECRET else None
+
+# AWS clients and the HTTP pool are created on first use and then reused
+_REGION = os.environ.get("AWS_REGION", "us-east-1")
+_clients: Dict[Tuple[str, str], object] = {}
+_http: Optional[urllib3.PoolManager] = None
 
 
 # =============================================================================
@@ -244,10 +352,76 @@ class TranscriptionError(VoicemailProcessingError):
     pass
 
 
+# =============================================================================
+# AWS CLIENTS
+# =============================================================================
+
+def _client_config(service: str, region: str):
+    """Build the shared botocore client configuration for service in region."""
+    from botocore.config import Config
+    
+    config = Config(
+        region_name=region,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        max_pool_connections=20,
+        tcp_keepalive=True
+    )
+    # s3v4 is S3's own signer (single path encoding); other services keep their default SigV4
+    if service == "s3":
+        config = config.merge(Config(signature_version="s3v4"))
+    return config
+
+
+def _get_client(service: str, region: Optional[str] = None):
+    """Return a boto3 client reused across warm invocations."""
+    region = region or _REGION
+    client = _clients.get((service, region))
+    if client is None:
+        client = _clients[(service, region)] = boto3.client(service, config=_client_config(service, region))
+    return client
+
+
+def get_s3_client(region: Optional[str] = None):
+    """Return the cached S3 client for region."""
+    return _get_client("s3", region)
+
+
+def get_transcribe_client(region: Optional[str] = None):
+    """Return the cached Transcribe client for region."""
+    return _get_client("transcribe", region)
+
+
+def get_ses_client(region: Optional[str] = None):
+    """Return the cached SES v2 client for region."""
+    return _get_client("sesv2", region)
+
+
+def _get_clients(region: str) -> Tuple[object, object]:
+    """Return the cached (S3, SES v2) clients used for voicemail processing."""
+    return get_s3_client(region), get_ses_client(region)
+
+
+def get_http_pool() -> urllib3.PoolManager:
+    """Return the pooled HTTP client used for non-S3 transcript fetches."""
+    global _http
+    if _http is None:
+        _http = urllib3.PoolManager(maxsize=4, retries=urllib3.Retry(total=3, backoff_factor=0.2))
+    return _http
+
+
 # =============================================================================
 # URL SIGNING FUNCTIONS
 # =============================================================================
 
+def _sign(secret_key: str, message: str) -> bytes:
+    """Return the HMAC-SHA256 of message, reusing the keyed prototype for the configured secret."""
+    if _HMAC_PROTO is not None and secret_key == _SIGNING_SECRET:
+        mac = _HMAC_PROTO.copy()
+        mac.update(message.encode())
+        return mac.digest()
+    return hmac.digest(secret_key.encode(), message.encode(), "sha256")
+
+
 def generate_signed_url(redirect_api_url: str, bucket: str, key: str, secret_key: str, validity_hours: int = 168) -> str:
     """Generate a signed URL that expires after validity_hours."""
     # Calculate expiration timestamp
@@ -255,11 +429,8 @@ def generate_signed_url(redirect_api_url: str, bucket: str, key: str, secret_key
     
     # Create signature
     message = f"{bucket}:{key}:{expires}"
-    signature = hmac.new(
-        secret_key.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    signature_bytes = _sign(secret_key, message)
+    signature = base64.urlsafe_b64encode(signature_bytes).rstrip(b"=").decode()
     
     # URL-encode the key
     encoded_key = quote(key, safe='')
@@ -273,13 +444,18 @@ def generate_signed_url(redirect_api_url: str, bucket: str, key: str, secret_key
 def verify_signature(bucket: str, key: str, expires: str, signature: str, secret_key: str) -> bool:
     """Verify the URL signature."""
     message = f"{bucket}:{key}:{expires}"
-    expected_signature = hmac.new(
-        secret_key.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    expected_signature = _sign(secret_key, message)
+    
+    # Links issued before the switch to base64url carry a 64-char hex signature
+    try:
+        if len(signature) == 64:
+            provided_signature = bytes.fromhex(signature)
+        else:
+            provided_signature = base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+    except ValueError:
+        return False
     
-    return hmac.compare_digest(signature, expected_signature)
+    return hmac.compare_digest(provided_signature, expected_signature)
 
 
 # =============================================================================
@@ -291,6 +467,8 @@ def handle_url_generation(event: dict) -> dict:
     Handle Function URL request to generate presigned URL.
     Expected path: /voicemail/{bucket}/{key}?expires={timestamp}&signature={hmac}
     """
+    now = int(time.time())
+    
     try:
         # Extract path and query parameters from Function URL event
         raw_path = event.get('rawPath', '')
@@ -298,7 +476,7 @@ def handle_url_generation(event: dict) -> dict:
         
         # Parse path: /voicemail/{bucket}/{remaining_key_path}
         if not raw_path.startswith('/voicemail/'):
-            logger.warning(f"Invalid path: {raw_path}")
+            logger.warning("Invalid path: %s", raw_path)
             return {
                 'statusCode': 404,
                 'headers': {'Content-Type': 'text/html'},
@@ -317,7 +495,7 @@ def handle_url_generation(event: dict) -> dict:
             }
         
         # Split at first '/' to get bucket and key
-        bucket, key_encoded = path_after_voicemail.split('/', 1)
+        bucket, _, key_encoded = path_after_voicemail.partition('/')
         
         # Get query parameters
         expires = query_parameters.get('expires')
@@ -334,20 +512,8 @@ def handle_url_generation(event: dict) -> dict:
         # Decode the key (it's URL-encoded)
         key = unquote(key_encoded)
         
-        # Check expiration
-        try:
-            expires_timestamp = int(expires)
-            current_timestamp = int(time.time())
-            
-            if current_timestamp > expires_timestamp:
-                expires_date = datetime.fromtimestamp(expires_timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
-                logger.warning(f"Link expired: {expires_date}")
-                return {
-                    'statusCode': 403,
-                    'headers': {'Content-Type': 'text/html'},
-                    'body': f'<h1>403 Forbidden</h1><p>This link expired on {expires_date}.</p><p>Please contact support for a new link.</p>'
-                }
-        except ValueError:
+        # Check expiration (ASCII digits only, which also rejects negative values)
+        if not (expires.isascii() and expires.isdigit()):
             logger.warning("Invalid expiration timestamp")
             return {
                 'statusCode': 400,
@@ -355,8 +521,18 @@ def handle_url_generation(event: dict) -> dict:
                 'body': '<h1>400 Bad Request</h1><p>Invalid expiration timestamp</p>'
             }
         
+        expires_timestamp = int(expires)
+        if now > expires_timestamp:
+            expires_date = datetime.fromtimestamp(expires_timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
+            logger.warning("Link expired: %s", expires_date)
+            return {
+                'statusCode': 403,
+                'headers': {'Content-Type': 'text/html'},
+                'body': f'<h1>403 Forbidden</h1><p>This link expired on {expires_date}.</p><p>Please contact support for a new link.</p>'
+            }
+        
         # Get signing secret
-        signing_secret = os.environ.get('SIGNING_SECRET', '')
+        signing_secret = _SIGNING_SECRET
         if not signing_secret:
             logger.error("SIGNING_SECRET not configured")
             return {
@@ -367,7 +543,7 @@ def handle_url_generation(event: dict) -> dict:
         
         # Verify signature
         if not verify_signature(bucket, key, expires, signature, signing_secret):
-            logger.warning(f"Invalid signature for {bucket}/{key}")
+            logger.warning("Invalid signature for %s/%s", bucket, key)
             return {
                 'statusCode': 403,
                 'headers': {'Content-Type': 'text/html'},
@@ -375,22 +551,21 @@ def handle_url_generation(event: dict) -> dict:
             }
         
         # Generate presigned URL
-        region = os.environ.get('AWS_REGION', 'us-east-1')
-        boto_config = Config(region_name=region, signature_version='s3v4')
-        s3_client = boto3.client('s3', config=boto_config)
+        s3_client = get_s3_client()
         
-        # Verify the object exists before generating URL
-        try:
-            s3_client.head_object(Bucket=bucket, Key=key)
-        except ClientError as e:
-            if e.response.get('Error', {}).get('Code') == '404':
-                logger.error(f"Recording not found: s3://{bucket}/{key}")
-                return {
-                    'statusCode': 404,
-                    'headers': {'Content-Type': 'text/html'},
-                    'body': '<h1>404 Not Found</h1><p>Recording not found. It may have been deleted.</p>'
-                }
-            raise
+        # S3 reports a missing object on redirect, so only check existence on request
+        if query_parameters.get('verify') == '1':
+            try:
+                s3_client.head_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == '404':
+                    logger.error("Recording not found: s3://%s/%s", bucket, key)
+                    return {
+                        'statusCode': 404,
+                        'headers': {'Content-Type': 'text/html'},
+                        'body': '<h1>404 Not Found</h1><p>Recording not found. It may have been deleted.</p>'
+                    }
+                raise
         
         presigned_url = s3_client.generate_presigned_url(
             'get_object',
@@ -403,7 +578,7 @@ def handle_url_generation(event: dict) -> dict:
             ExpiresIn=3600  # 1 hour to listen
         )
         
-        logger.info(f"[URL GENERATED] s3://{bucket}/{key}")
+        logger.info("[URL GENERATED] s3://%s/%s", bucket, key)
         
         # Redirect to the presigned URL
         return {
@@ -415,7 +590,7 @@ def handle_url_generation(event: dict) -> dict:
         }
         
     except Exception as e:
-        logger.error(f"Error generating URL: {e}", exc_info=True)
+        logger.error("Error generating URL: %s", e, exc_info=True)
         return {
             'statusCode': 500,
             'headers': {'Content-Type': 'text/html'},
@@ -429,20 +604,63 @@ def handle_url_generation(event: dict) -> dict:
 
 def parse_s3_uri(uri: str) -> Tuple[str, str]:
     """Parse S3 URI into bucket and key."""
-    rest = uri[5:]
-    bucket, key = rest.split("/", 1)
+    bucket, _, key = uri[5:].partition("/")
+    if not key:
+        raise ValueError(f"S3 URI has no key: {uri}")
     return bucket, key
 
 
+def parse_s3_https_url(url: str) -> Optional[Tuple[str, str]]:
+    """Parse an unsigned S3 HTTPS URL into bucket and key, or None if it is not one."""
+    parsed = urlsplit(url)
+    # Presigned URLs (e.g. Transcribe's service-managed bucket) must be fetched as-is
+    if parsed.scheme != "https" or "X-Amz-" in parsed.query:
+        return None
+    
+    path = unquote(parsed.path.lstrip("/"))
+    match = _S3_VIRTUAL_HOST.match(parsed.netloc)
+    if match:
+        return (match.group(1), path) if path else None
+    if _S3_PATH_HOST.match(parsed.netloc) and "/" in path:
+        bucket, _, key = path.partition("/")
+        return bucket, key
+    return None
+
+
+def _open_uri(uri: str, region: str):
+    """Open an S3 URI or HTTP URL as a readable, closeable stream."""
+    location = parse_s3_uri(uri) if uri.startswith("s3://") else parse_s3_https_url(uri)
+    if location:
+        bucket, key = location
+        return get_s3_client(region).get_object(Bucket=bucket, Key=key)["Body"]
+    
+    response = get_http_pool().request("GET", uri, preload_content=False)
+    if response.status >= 400:
+        response.release_conn()
+        raise VoicemailProcessingError(f"Failed to fetch {uri}: HTTP {response.status}")
+    return response
+
+
 def fetch_json(uri: str, region: str) -> dict:
     """Fetch and parse JSON from S3 URI or HTTP URL."""
-    if uri.startswith("s3://"):
-        bucket, key = parse_s3_uri(uri)
-        s3_client = boto3.client("s3", region_name=region)
-        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
-    else:
-        body = urllib.request.urlopen(uri).read()
-    return json.loads(body)
+    with closing(_open_uri(uri, region)) as stream:
+        body = stream.read()
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def fetch_transcript_results(uri: str, region: str) -> dict:
+    """Fetch Transcribe output, keeping only the result sections the preview and duration use."""
+    if ijson is None:
+        results = fetch_json(uri, region).get("results", {})
+        return {name: results[name] for name in TRANSCRIPT_RESULT_FIELDS if name in results}
+    
+    # Stream section by section so the raw body and unused sections
+    # (e.g. audio_segments) are never held in memory at once
+    with closing(_open_uri(uri, region)) as stream:
+        return {
+            name: value for name, value in ijson.kvitems(stream, "results", use_float=True)
+            if name in TRANSCRIPT_RESULT_FIELDS
+        }
 
 
 def extract_region_from_arn(arn: str) -> Optional[str]:
@@ -453,6 +671,7 @@ def extract_region_from_arn(arn: str) -> Optional[str]:
         return None
 
 
+@lru_cache(maxsize=8)
 def resolve_region(instance_arn: str) -> str:
     """Resolve AWS region from instance ARN or session."""
     region = extract_region_from_arn(instance_arn)
@@ -473,8 +692,9 @@ def resolve_region(instance_arn: str) -> str:
     return region
 
 
+@lru_cache(maxsize=1)
 def validate_environment() -> Tuple[str, int, str, int]:
-    """Validate and retrieve environment variables."""
+    """Validate and retrieve environment variables (cached; config changes start a new container)."""
     base_path = os.environ.get("BASE_PATH", "").strip("/")
     if not base_path:
         raise ValueError("BASE_PATH environment variable is required")
@@ -493,15 +713,19 @@ def validate_environment() -> Tuple[str, int, str, int]:
 # TRANSCRIPTION PROCESSING
 # =============================================================================
 
-def build_transcription_preview(results: dict, mode: str, limit: int) -> str:
-    """Build transcription preview from AWS Transcribe results."""
-    if mode == "channel" and results.get("channel_labels"):
-        return _build_preview_channel(results, limit)
-    elif mode == "diarization" and results.get("speaker_labels"):
+def summarize_transcription(results: dict, mode: str, limit: int) -> Tuple[str, float]:
+    """Build the transcription preview and actual recording duration from AWS Transcribe results."""
+    # The diarization walk visits every item anyway, so it tracks the duration as it goes
+    if mode == "diarization" and results.get("speaker_labels"):
         return _build_preview_diarization(results, limit)
+    
+    if mode == "channel" and results.get("channel_labels"):
+        preview = _build_preview_channel(results, limit)
     else:
         transcript = results.get("transcripts", [{}])[0].get("transcript", "")
-        return transcript[:limit].strip()
+        preview = transcript[:limit].strip()
+    
+    return preview, get_actual_recording_duration(results)
 
 
 def _build_preview_channel(results: dict, limit: int) -> str:
@@ -509,28 +733,33 @@ def _build_preview_channel(results: dict, limit: int) -> str:
     channels = results.get("channel_labels", {}).get("channels", [])
     all_words = []
     
+    # Stop collecting well past the preview length; the rest is sliced off anyway
+    budget = limit * 2
+    collected = 0
+    
     for channel in channels:
+        tokens = ((item.get("type"), item["alternatives"][0].get("content", "")) for item in channel.get("items", []))
         words = []
-        for item in channel.get("items", []):
-            item_type = item.get("type")
-            content = item["alternatives"][0].get("content", "")
-            
-            if item_type == "pronunciation":
+        for item_type, content in tokens:
+            if item_type == "pronunciation" or (item_type == "punctuation" and not words):
                 words.append(content)
-            elif item_type == "punctuation" and words:
-                words[-1] += content
             elif item_type == "punctuation":
-                words.append(content)
+                words[-1] += content
+            collected += len(content) + 1
+            if collected > budget:
+                break
         
-        text = " ".join(words).replace(" ,", ",").replace(" .", ".").strip()
+        text = _PUNCT_FIX.sub(r"\1", " ".join(words)).strip()
         if text:
             all_words.append(text)
+        if collected > budget:
+            break
     
-    return " ".join(all_words).strip()[:limit]
+    return " ".join(all_words)[:limit].strip()
 
 
-def _build_preview_diarization(results: dict, limit: int) -> str:
-    """Build preview from speaker-diarized results."""
+def _build_preview_diarization(results: dict, limit: int) -> Tuple[str, float]:
+    """Build preview and duration from speaker-diarized results."""
     speaker_map = {}
     for segment in results.get("speaker_labels", {}).get("segments", []):
         speaker = segment.get("speaker_label", "spk_?")
@@ -539,33 +768,32 @@ def _build_preview_diarization(results: dict, limit: int) -> str:
             if start_time:
                 speaker_map[start_time] = speaker
     
+    # Words carry their leading space and punctuation is appended bare, so the
+    # fragments of every speaker concatenate into the final text in one join
     per_speaker = {}
     current_speaker = None
+    end_time = None
     
     for item in results.get("items", []):
         item_type = item.get("type")
         
         if item_type == "pronunciation":
             start_time = item.get("start_time")
+            end_time = item.get("end_time") or end_time
             current_speaker = speaker_map.get(start_time, current_speaker)
             content = item["alternatives"][0].get("content", "")
-            per_speaker.setdefault(current_speaker or "spk_?", []).append(content)
+            per_speaker.setdefault(current_speaker or "spk_?", []).extend((" ", content))
         elif item_type == "punctuation" and current_speaker in per_speaker:
-            if per_speaker[current_speaker]:
-                content = item["alternatives"][0].get("content", "")
-                per_speaker[current_speaker][-1] += content
-    
-    all_text = []
-    for speaker, words in per_speaker.items():
-        text = " ".join(words).replace(" ,", ",").replace(" .", ".").strip()
-        if text:
-            all_text.append(text)
+            per_speaker[current_speaker].append(item["alternatives"][0].get("content", ""))
     
-    return " ".join(all_text).strip()[:limit]
+    # Drop the leading separator before slicing so only the preview is stripped
+    text = "".join(fragment for fragments in per_speaker.values() for fragment in fragments)
+    return text[1:limit + 1].strip(), float(end_time) if end_time else 0.0
 
 
 def get_actual_recording_duration(results: dict) -> float:
     """Calculate actual recording duration excluding trailing silence."""
+    # Scanning from the end stops at the last timed item, so this stays cheap
     try:
         items = results.get("items", [])
         if not items:
@@ -577,13 +805,13 @@ def get_actual_recording_duration(results: dict) -> float:
         
         return 0.0
     except Exception as e:
-        logger.warning(f"Could not calculate duration: {e}")
+        logger.warning("Could not calculate duration: %s", e)
         return 0.0
 
 
 def start_transcription_job(media_s3_uri: str, region: str, mode: str, language: str) -> str:
     """Start AWS Transcribe job for audio file."""
-    transcribe_client = boto3.client("transcribe", region_name=region)
+    transcribe_client = get_transcribe_client(region)
     job_name = f"voicemail-transcribe-{int(time.time())}"
     
     request = {
@@ -619,9 +847,11 @@ def start_transcription_job(media_s3_uri: str, region: str, mode: str, language:
 
 
 def wait_for_transcription(job_name: str, region: str) -> dict:
-    """Wait for transcription job to complete."""
-    transcribe_client = boto3.client("transcribe", region_name=region)
-    waited = 0
+    """Wait for transcription job to complete, polling with exponential backoff."""
+    transcribe_client = get_transcribe_client(region)
+    interval = TRANSCRIBE_POLL_INITIAL_SECS
+    # Deadline includes API latency, not just time spent sleeping
+    deadline = time.monotonic() + TRANSCRIBE_MAX_WAIT_SECS
     
     while True:
         job = transcribe_client.get_transcription_job(TranscriptionJobName=job_name)["TranscriptionJob"]
@@ -630,69 +860,147 @@ def wait_for_transcription(job_name: str, region: str) -> dict:
         if status in ("COMPLETED", "FAILED"):
             return job
         
-        time.sleep(TRANSCRIBE_POLL_SECS)
-        waited += TRANSCRIBE_POLL_SECS
-        
-        if waited >= TRANSCRIBE_MAX_WAIT_SECS:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
             raise TimeoutError(f"Transcription job '{job_name}' timed out")
+        
+        time.sleep(min(interval, remaining))
+        interval = min(interval * TRANSCRIBE_POLL_BACKOFF, TRANSCRIBE_POLL_MAX_SECS)
 
 
 # =============================================================================
 # S3 RECORDING SEARCH
 # =============================================================================
 
-def generate_s3_uris_with_time_window(
-    bucket: str, prefix: str, initial_contact_id: str, now: datetime, minutes_offset: int
+def _recording_date_paths(now_sec: int, window_minutes: int) -> List[str]:
+    """Return the distinct S3 date paths covered by the time window."""
+    # The window is far shorter than a day, so its two ends cover every date
+    date_paths = []
+    for t in (now_sec - window_minutes * 60, now_sec + window_minutes * 60):
+        tm = time.gmtime(t)
+        date_path = f"{tm.tm_year:04d}/{tm.tm_mon:02d}/{tm.tm_mday:02d}"
+        if date_path not in date_paths:
+            date_paths.append(date_path)
+    return date_paths
+
+
+def _parse_recording_key(bucket: str, key: str, initial_contact_id: str) -> Optional[Dict[str, str]]:
+    """Parse a recording key into a location, or None if it is not a recording."""
+    filename = key.rsplit("/", 1)[-1]
+    name_prefix = f"{initial_contact_id}_"
+    if not filename.startswith(name_prefix) or not filename.endswith("_UTC.wav"):
+        return None
+    
+    # Timestamp format is YYYYMMDDTHH:MM
+    timestamp = filename[len(name_prefix):-len("_UTC.wav")]
+    if len(timestamp) != 14 or timestamp[8] != "T" or timestamp[11] != ":":
+        return None
+    try:
+        recorded_sec = calendar.timegm((
+            int(timestamp[0:4]), int(timestamp[4:6]), int(timestamp[6:8]),
+            int(timestamp[9:11]), int(timestamp[12:14]), 0
+        ))
+    except ValueError:
+        return None
+    
+    return {
+        "bucket": bucket,
+        "key": key,
+        "uri": f"s3://{bucket}/{key}",
+        "timestamp": timestamp,
+        "recorded_sec": recorded_sec
+    }
+
+
+def _list_recordings(
+    s3_client, bucket: str, key_prefix: str, initial_contact_id: str, start_sec: int, end_sec: int
 ) -> List[Dict[str, str]]:
-    """Generate S3 URIs for potential recording locations within time window."""
-    fmt_day = "%Y/%m/%d"
-    fmt_time = "%Y%m%dT%H:%M"
-    s3_uris = []
+    """List the contact's recordings under key_prefix timestamped between start_sec and end_sec."""
+    # Keys sort by their timestamp, so skip straight to the start of the window
+    tm = time.gmtime(start_sec)
+    start_after = (
+        f"{key_prefix}{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}T{tm.tm_hour:02d}:{tm.tm_min:02d}"
+    )
+    logger.info("Listing s3://%s/%s* after %s", bucket, key_prefix, start_after)
     
-    for offset in range(-minutes_offset, minutes_offset + 1):
-        dt = now + timedelta(minutes=offset)
-        date_path = dt.strftime(fmt_day)
-        timestamp = dt.strftime(fmt_time)
-        filename = f"{initial_contact_id}_{timestamp}_UTC.wav"
-        
-        key = f"{prefix}/ivr/{date_path}/{filename}" if prefix else f"ivr/{date_path}/{filename}"
-        uri = f"s3://{bucket}/{key}"
-        
-        s3_uris.append({
-            "key": key,
-            "uri": uri,
-            "timestamp": timestamp,
-            "offset_minutes": offset
-        })
+    paginator = s3_client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=bucket, Prefix=key_prefix, StartAfter=start_after,
+        PaginationConfig={"PageSize": 20, "MaxItems": 20}
+    )
     
-    return s3_uris
+    locations = []
+    for page in pages:
+        for obj in page.get("Contents", []):
+            location = _parse_recording_key(bucket, obj["Key"], initial_contact_id)
+            if not location:
+                continue
+            if location["recorded_sec"] > end_sec:
+                return locations
+            locations.append(location)
+    return locations
+
+
+def parse_initiation_timestamp(value) -> Optional[int]:
+    """Parse a contact InitiationTimestamp (ISO 8601 or epoch seconds) to epoch seconds."""
+    if not value:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except (TypeError, ValueError):
+        logger.warning("Ignoring unparseable InitiationTimestamp: %s", value)
+        return None
 
 
 def find_recording_in_s3(
-    s3_client, bucket: str, prefix: str, initial_contact_id: str
+    s3_client, bucket: str, prefix: str, initial_contact_id: str, initiated_at: Optional[int] = None
 ) -> Optional[Dict[str, str]]:
-    """Search for recording file in S3 with decreasing time windows."""
-    now = datetime.utcnow()
+    """
+    Find the contact's recording by listing its key prefix.
+    Prefers a recording within ±INITIATION_WINDOW_MINUTES of the contact's
+    initiation time when known, then the closest within ±MAX_TIME_WINDOW_MINUTES of now.
+    """
+    windows = [(int(time.time()) // 60 * 60, MAX_TIME_WINDOW_MINUTES)]
+    if initiated_at is not None:
+        windows.insert(0, (initiated_at // 60 * 60, INITIATION_WINDOW_MINUTES))
     
-    for window_minutes in range(MAX_TIME_WINDOW_MINUTES, 0, -1):
-        logger.info(f"Searching with time window: ±{window_minutes} minutes")
-        
-        s3_uris = generate_s3_uris_with_time_window(bucket, prefix, initial_contact_id, now, window_minutes)
-        s3_uris.sort(key=lambda x: abs(x['offset_minutes']))
-        
-        for location in s3_uris:
-            try:
-                s3_client.head_object(Bucket=bucket, Key=location["key"])
-                logger.info(f"[SUCCESS] Found at {location['uri']} (offset: {location['offset_minutes']}m)")
-                return location
-            except ClientError as e:
-                if e.response.get("Error", {}).get("Code") != "404":
-                    logger.error(f"Error checking S3 object: {e}")
-                    raise
-        
-        if window_minutes > 1:
-            logger.info(f"Not found in ±{window_minutes}m window, trying ±{window_minutes - 1}m...")
-            time.sleep(0.5)
+    date_paths = []
+    for center_sec, window_minutes in windows:
+        for date_path in _recording_date_paths(center_sec, window_minutes):
+            if date_path not in date_paths:
+                date_paths.append(date_path)
+    key_prefixes = [
+        (f"{prefix}/ivr/{date_path}/" if prefix else f"ivr/{date_path}/") + f"{initial_contact_id}_"
+        for date_path in date_paths
+    ]
+    start_sec = min(center_sec - window_minutes * 60 for center_sec, window_minutes in windows)
+    end_sec = max(center_sec + window_minutes * 60 for center_sec, window_minutes in windows)
+    
+    # Near midnight the windows span two date paths; list them concurrently
+    if len(key_prefixes) == 1:
+        listings = [_list_recordings(s3_client, bucket, key_prefixes[0], initial_contact_id, start_sec, end_sec)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(key_prefixes)) as executor:
+            listings = list(executor.map(
+                lambda key_prefix: _list_recordings(
+                    s3_client, bucket, key_prefix, initial_contact_id, start_sec, end_sec
+                ),
+                key_prefixes
+            ))
+    locations = [location for listing in listings for location in listing]
+    
+    for center_sec, window_minutes in windows:
+        in_window = []
+        for location in locations:
+            offset_minutes = (location["recorded_sec"] - center_sec) // 60
+            if abs(offset_minutes) <= window_minutes:
+                in_window.append(dict(location, offset_minutes=offset_minutes))
+        if in_window:
+            best = min(in_window, key=lambda x: abs(x["offset_minutes"]))
+            logger.info("[SUCCESS] Found at %s (offset: %sm)", best['uri'], best['offset_minutes'])
+            return best
     
     return None
 
@@ -701,18 +1009,7 @@ def find_recording_in_s3(
 # EMAIL GENERATION
 # =============================================================================
 
-def create_html_email(
-    caller_number: str, preview: str, redirect_url: str, 
-    recipient_name: str, recording_duration: float = 0.0
-) -> str:
-    """Create HTML email body with voicemail details."""
-    duration_text = ""
-    if recording_duration > 0:
-        minutes = int(recording_duration // 60)
-        seconds = int(recording_duration % 60)
-        duration_text = f"<p style='color: #666; font-size: 14px; margin: 10px 0 0 0; text-align: left;'>Duration: {minutes}m {seconds}s</p>" if minutes > 0 else f"<p style='color: #666; font-size: 14px; margin: 10px 0 0 0; text-align: left;'>Duration: {seconds}s</p>"
-    
-    return f"""
+_HTML_TEMPLATE = """
     <html>
     <head>
         <style>
@@ -730,10 +1027,10 @@ def create_html_email(
         <div class="container">
             <div class="header">
                 <h2>Voicemail for: {recipient_name}</h2>
-                <p>There is a voicemail from <strong>{caller_number}</strong>.</p>
+                <p>There is a voicemail from <strong>{caller}</strong>.</p>
             </div>
-            <p><a href="{redirect_url}">Listen to the voicemail.</a></p>
-            {duration_text}
+            <p><a href="{url}">Listen to the voicemail.</a></p>
+            {duration_html}
             <h3>Voicemail transcription</h3>
             <div class="preview">{preview}</div>
         </div>
@@ -741,28 +1038,56 @@ def create_html_email(
     </html>
     """
 
+_HTML_DURATION_TEMPLATE = "<p style='color: #666; font-size: 14px; margin: 10px 0 0 0; text-align: left;'>Duration: {duration}</p>"
 
-def create_text_email(
-    caller_number: str, preview: str, redirect_url: str,
-    recipient_name: str, recording_duration: float = 0.0
-) -> str:
-    """Create plain text email body as fallback."""
-    duration_text = ""
-    if recording_duration > 0:
-        minutes = int(recording_duration // 60)
-        seconds = int(recording_duration % 60)
-        duration_text = f"\nDuration: {minutes}m {seconds}s" if minutes > 0 else f"\nDuration: {seconds}s"
-    
-    return f"""Voicemail for: {recipient_name}
+_TEXT_TEMPLATE = """Voicemail for: {recipient_name}
 
-There is a voicemail from {caller_number}{duration_text}
+There is a voicemail from {caller}{duration_text}
 
 Voicemail transcription:
 {preview}
 
 Listen to the full recording here:
-{redirect_url}
-""".strip()
+{url}"""
+
+
+def _format_duration(recording_duration: float) -> str:
+    """Format duration as '1m 5s' or '5s'; empty when unknown."""
+    if recording_duration <= 0:
+        return ""
+    minutes = int(recording_duration // 60)
+    seconds = int(recording_duration % 60)
+    return f"{minutes}m {seconds}s" if minutes > 0 else f"{seconds}s"
+
+
+def create_html_email(
+    caller_number: str, preview: str, redirect_url: str, 
+    recipient_name: str, recording_duration: float = 0.0
+) -> str:
+    """Create HTML email body with voicemail details."""
+    duration = _format_duration(recording_duration)
+    return _HTML_TEMPLATE.format_map({
+        "recipient_name": recipient_name,
+        "caller": caller_number,
+        "url": redirect_url,
+        "duration_html": _HTML_DURATION_TEMPLATE.format(duration=duration) if duration else "",
+        "preview": preview
+    })
+
+
+def create_text_email(
+    caller_number: str, preview: str, redirect_url: str,
+    recipient_name: str, recording_duration: float = 0.0
+) -> str:
+    """Create plain text email body as fallback."""
+    duration = _format_duration(recording_duration)
+    return _TEXT_TEMPLATE.format_map({
+        "recipient_name": recipient_name,
+        "caller": caller_number,
+        "url": redirect_url,
+        "duration_text": f"\nDuration: {duration}" if duration else "",
+        "preview": preview
+    }).strip()
 
 
 def send_email_with_recording(
@@ -774,9 +1099,32 @@ def send_email_with_recording(
     html_body = create_html_email(caller_number, preview, redirect_url, recipient_name, recording_duration)
     text_body = create_text_email(caller_number, preview, redirect_url, recipient_name, recording_duration)
     
+    recipients = [r.strip() for r in email_recipient.split(",") if r.strip()]
+    
+    if len(recipients) > 1:
+        # One API call for all recipients, each getting their own message
+        response = ses_client.send_bulk_email(
+            FromEmailAddress=email_sender,
+            DefaultContent={
+                "Template": {
+                    "TemplateContent": {"Subject": subject, "Html": html_body, "Text": text_body},
+                    "TemplateData": "{}"
+                }
+            },
+            BulkEmailEntries=[{"Destination": {"ToAddresses": [r]}} for r in recipients]
+        )
+        
+        results = response.get("BulkEmailEntryResults", [])
+        failed = [(r, result) for r, result in zip(recipients, results) if result.get("Status") != "SUCCESS"]
+        for recipient, result in failed:
+            logger.error("Email to %s failed: %s %s", recipient, result.get('Status'), result.get('Error', ''))
+        if len(failed) == len(recipients):
+            raise VoicemailProcessingError("Bulk email send failed for all recipients")
+        return response
+    
     return ses_client.send_email(
         FromEmailAddress=email_sender,
-        Destination={"ToAddresses": [email_recipient]},
+        Destination={"ToAddresses": recipients},
         Content={
             "Simple": {
                 "Subject": {"Data": subject, "Charset": "UTF-8"},
@@ -789,140 +1137,297 @@ def send_email_with_recording(
     )
 
 
+def get_message_ids(response: dict) -> List[str]:
+    """Extract message IDs from a SendEmail or SendBulkEmail response."""
+    if "MessageId" in response:
+        return [response["MessageId"]]
+    return [r["MessageId"] for r in response.get("BulkEmailEntryResults", []) if r.get("MessageId")]
+
+
 # =============================================================================
 # VOICEMAIL PROCESSING HANDLER
 # =============================================================================
 
+def parse_contact(event: dict) -> Tuple[str, dict]:
+    """Extract the initial contact ID and the processing context from a Connect event."""
+    contact_data = event["Details"]["ContactData"]
+    attributes = contact_data.get("Attributes", {})
+    email_recipient = attributes.get("emailRecipient")
+    
+    return contact_data["InitialContactId"], {
+        "instance_arn": contact_data["InstanceARN"],
+        "caller_number": contact_data.get("CustomerEndpoint", {}).get("Address", "Unknown"),
+        "initiated_at": parse_initiation_timestamp(contact_data.get("InitiationTimestamp")),
+        "email_recipient": email_recipient,
+        "recipient_name": attributes.get("RecipientName", email_recipient),
+        "skip_transcription": (
+            attributes.get("SkipTranscription", "").lower() == "true" or DEFAULT_PREVIEW_LEN <= 0
+        )
+    }
+
+
+def enqueue_recording_search(
+    initial_contact_id: str,
+    ctx: dict,
+    delay_seconds: int,
+    context,
+    fallback: bool = False,
+    location: Optional[Dict[str, str]] = None,
+    name_suffix: str = ""
+) -> bool:
+    """
+    Schedule a one-time invocation of this function to process the recording after delay_seconds.
+    
+    A fallback invocation only processes the contact if it is still registered in CONTACT_TABLE.
+    Returns False if a schedule with the same name is already pending.
+    """
+    run_at = time.gmtime(time.time() + delay_seconds)
+    payload = {"source": SCHEDULED_EVENT_SOURCE, "initialContactId": initial_contact_id, "contact": ctx}
+    if fallback:
+        payload["fallback"] = True
+    if location:
+        payload["location"] = location
+    
+    try:
+        _get_client("scheduler").create_schedule(
+            Name=f"voicemail-{initial_contact_id}{name_suffix}"[:64],
+            ScheduleExpression=f"at({time.strftime('%Y-%m-%dT%H:%M:%S', run_at)})",
+            ScheduleExpressionTimezone="UTC",
+            FlexibleTimeWindow={"Mode": "OFF"},
+            ActionAfterCompletion="DELETE",
+            Target={
+                "Arn": context.invoked_function_arn,
+                "RoleArn": os.environ["SCHEDULER_ROLE_ARN"],
+                "Input": json.dumps(payload)
+            }
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConflictException":
+            raise
+        logger.warning("Processing already scheduled for %s", initial_contact_id)
+        return False
+    
+    return True
+
+
+def dispatch_voicemail_processing(event: dict, context) -> None:
+    """Re-invoke this function asynchronously to process a Connect event in the background."""
+    payload = {"internal": ASYNC_PROCESS_TASK, "event": event}
+    _get_client("lambda").invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType="Event",
+        Payload=json.dumps(payload)
+    )
+
+
+def register_contact(initial_contact_id: str, ctx: dict) -> None:
+    """Store the contact context so the recording's S3 upload event can be correlated."""
+    _get_client("dynamodb").put_item(
+        TableName=os.environ["CONTACT_TABLE"],
+        Item={
+            "InitialContactId": {"S": initial_contact_id},
+            "contact": {"S": json.dumps(ctx)},
+            "expiresAt": {"N": str(int(time.time()) + CONTACT_TTL_SECS)}
+        }
+    )
+
+
+def claim_contact(initial_contact_id: str) -> Optional[dict]:
+    """Remove and return a registered contact context, or None if there is none."""
+    response = _get_client("dynamodb").delete_item(
+        TableName=os.environ["CONTACT_TABLE"],
+        Key={"InitialContactId": {"S": initial_contact_id}},
+        ReturnValues="ALL_OLD"
+    )
+    item = response.get("Attributes")
+    return json.loads(item["contact"]["S"]) if item else None
+
+
+def process_claimed_contact(
+    initial_contact_id: str,
+    ctx: dict,
+    context,
+    location: Optional[Dict[str, str]] = None,
+    schedule_retry: bool = False
+) -> dict:
+    """Process a claimed contact, registering it again (and optionally scheduling a retry) if processing fails."""
+    result = process_recording(initial_contact_id, ctx, location)
+    if result.get("statusCode") == 200:
+        return result
+    
+    # The claim deleted the item; put it back so the failure is not lost
+    try:
+        register_contact(initial_contact_id, ctx)
+        logger.warning("Processing failed for %s, contact registered again", initial_contact_id)
+        # Only upload events schedule a retry; a failed fallback is not retried, so failures cannot loop
+        if schedule_retry and os.environ.get("SCHEDULER_ROLE_ARN"):
+            # Named apart from the pending fallback search so the retry keeps the known location
+            if enqueue_recording_search(
+                initial_contact_id, ctx, CONTACT_FALLBACK_GRACE_SECS, context,
+                fallback=True, location=location, name_suffix="-retry"
+            ):
+                logger.info("[SCHEDULED] Retry in %ss", CONTACT_FALLBACK_GRACE_SECS)
+    except Exception as e:
+        logger.error("Failed to register contact again: %s", e)
+    
+    return result
+
+
+def handle_scheduled_processing(event: dict, context) -> dict:
+    """Handle a scheduled invocation, skipping fallbacks for contacts an upload event already claimed."""
+    initial_contact_id = event["initialContactId"]
+    if not event.get("fallback"):
+        return process_recording(initial_contact_id, event["contact"])
+    
+    ctx = claim_contact(initial_contact_id)
+    if not ctx:
+        logger.info("Voicemail for %s already processed, skipping fallback", initial_contact_id)
+        return {"statusCode": 200, "message": "Voicemail already processed"}
+    
+    logger.info("[FALLBACK] Processing %s without an upload event", initial_contact_id)
+    return process_claimed_contact(initial_contact_id, ctx, context, event.get("location"))
+
+
+def handle_recording_uploaded(event: dict, context) -> dict:
+    """Handle S3 ObjectCreated events for recordings of registered voicemail contacts."""
+    processed = 0
+    
+    for record in event["Records"]:
+        bucket = record["s3"]["bucket"]["name"]
+        key = unquote_plus(record["s3"]["object"]["key"])
+        initial_contact_id = key.rsplit("/", 1)[-1].split("_", 1)[0]
+        
+        location = _parse_recording_key(bucket, key, initial_contact_id)
+        if not location:
+            logger.info("Ignoring non-recording object s3://%s/%s", bucket, key)
+            continue
+        
+        # Deleting the item claims it, so a redelivered S3 event is not processed twice
+        ctx = claim_contact(initial_contact_id)
+        if not ctx:
+            logger.info("No voicemail registered for %s, skipping", initial_contact_id)
+            continue
+        
+        logger.info("[SUCCESS] Recording uploaded at %s", location['uri'])
+        result = process_claimed_contact(initial_contact_id, ctx, context, location, schedule_retry=True)
+        if result.get("statusCode") == 200:
+            processed += 1
+    
+    return {"statusCode": 200, "message": f"Processed {processed} recording(s)"}
+
+
 def handle_voicemail_processing(event: dict, context) -> dict:
     """Handle Amazon Connect voicemail processing."""
-    logger.info("=" * 80)
+    logger.info(_SEP)
     logger.info("VOICEMAIL PROCESSING STARTED")
-    logger.info("=" * 80)
+    logger.info(_SEP)
     
     try:
         # Validate environment and extract contact data
-        base_path, url_expiration, email_sender, recording_wait_time = validate_environment()
-        
-        contact_data = event["Details"]["ContactData"]
-        initial_contact_id = contact_data["InitialContactId"]
-        contact_id = contact_data["ContactId"]
-        instance_arn = contact_data["InstanceARN"]
-        attributes = contact_data.get("Attributes", {})
-        
-        caller_number = contact_data.get("CustomerEndpoint", {}).get("Address", "Unknown")
-        email_recipient = attributes.get("emailRecipient")
-        recipient_name = attributes.get("RecipientName", email_recipient)
+        _, _, email_sender, recording_wait_time = validate_environment()
+        initial_contact_id, ctx = parse_contact(event)
         
         # Log configuration
-        logger.info(f"Contact ID: {initial_contact_id}")
-        logger.info(f"Caller: {caller_number}")
-        logger.info(f"Email: {email_sender} -> {email_recipient or 'MISSING'}")
-        logger.info(f"Recipient: {recipient_name}")
-        logger.info(f"Wait time: {recording_wait_time}s")
+        logger.info("Contact ID: %s", initial_contact_id)
+        logger.info("Caller: %s", ctx['caller_number'])
+        logger.info("Email: %s -> %s", email_sender, ctx['email_recipient'] or 'MISSING')
+        logger.info("Recipient: %s", ctx['recipient_name'])
+        logger.info("Wait time: %ss", recording_wait_time)
         
-        if not email_recipient:
+        if not ctx["email_recipient"]:
             logger.error("Missing emailRecipient attribute")
             return {"statusCode": 400, "message": "Missing emailRecipient attribute"}
         
     except KeyError as e:
-        logger.error(f"Missing contact data: {e}")
+        logger.error("Missing contact data: %s", e)
         return {"statusCode": 400, "message": f"Missing contact data: {str(e)}"}
     except ValueError as e:
-        logger.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
         return {"statusCode": 500, "message": str(e)}
     
-    # Initialize AWS clients
-    try:
-        region = resolve_region(instance_arn)
-        boto_config = Config(region_name=region, signature_version="s3v4")
+    # Let the recording's S3 upload event trigger processing, when configured
+    if os.environ.get("CONTACT_TABLE"):
+        try:
+            register_contact(initial_contact_id, ctx)
+            logger.info("[REGISTERED] Waiting for recording upload event")
+        except Exception as e:
+            logger.error("Failed to register contact: %s", e)
+            return {"statusCode": 500, "message": "Failed to register contact"}
         
-        s3_client = boto3.client("s3", config=boto_config)
-        ses_client = boto3.client("sesv2", config=boto_config)
+        # Search for the recording later in case its upload event never correlates
+        if os.environ.get("SCHEDULER_ROLE_ARN"):
+            try:
+                fallback_delay = recording_wait_time + CONTACT_FALLBACK_GRACE_SECS
+                if enqueue_recording_search(initial_contact_id, ctx, fallback_delay, context, fallback=True):
+                    logger.info("[SCHEDULED] Fallback search in %ss", fallback_delay)
+            except Exception as e:
+                logger.error("Failed to schedule fallback search: %s", e)
+        else:
+            logger.warning("SCHEDULER_ROLE_ARN not set, no fallback if the upload event is missed")
         
-        logger.info(f"AWS clients initialized in {region}")
-    except Exception as e:
-        logger.error(f"Failed to initialize AWS clients: {e}")
-        return {"statusCode": 500, "message": "Failed to initialize AWS clients"}
+        return {"statusCode": 200, "message": "Voicemail registered"}
     
-    # Parse S3 path
-    parts = base_path.split("/", 1)
-    bucket = parts[0]
-    prefix = parts[1] if len(parts) > 1 else ""
+    # Hand the wait to EventBridge Scheduler instead of sleeping, when configured
+    if os.environ.get("SCHEDULER_ROLE_ARN"):
+        try:
+            if enqueue_recording_search(initial_contact_id, ctx, recording_wait_time, context):
+                logger.info("[SCHEDULED] Processing in %ss", recording_wait_time)
+            return {"statusCode": 200, "message": "Voicemail processing scheduled"}
+        except Exception as e:
+            logger.error("Failed to schedule processing: %s", e)
+            return {"statusCode": 500, "message": "Failed to schedule processing"}
     
     # Wait for recording to complete and upload
-    logger.info(f"Waiting {recording_wait_time}s for recording to complete...")
+    logger.info("Waiting %ss for recording to complete...", recording_wait_time)
     time.sleep(recording_wait_time)
     
-    # Find recording with retry
+    return process_recording(initial_contact_id, ctx)
+
+
+def process_recording(initial_contact_id: str, ctx: dict, location: Optional[Dict[str, str]] = None) -> dict:
+    """Find (unless location is given), transcribe and email the recording for a contact."""
     try:
-        location = None
-        for attempt in range(1, 3):
-            logger.info(f"Search attempt {attempt}/2")
-            start_time = time.time()
-            
-            location = find_recording_in_s3(s3_client, bucket, prefix, initial_contact_id)
+        _, url_expiration, email_sender, _ = validate_environment()
+    except ValueError as e:
+        logger.error("Configuration error: %s", e)
+        return {"statusCode": 500, "message": str(e)}
+    
+    bucket, prefix = _BUCKET, _PREFIX
+    
+    # Initialize AWS clients
+    try:
+        region = resolve_region(ctx["instance_arn"])
+        s3_client, ses_client = _get_clients(region)
+        
+        logger.info("AWS clients ready in %s", region)
+    except Exception as e:
+        logger.error("Failed to initialize AWS clients: %s", e)
+        return {"statusCode": 500, "message": "Failed to initialize AWS clients"}
+    
+    # Find recording, unless its upload event already located it
+    try:
+        if location is None:
+            start_ns = time.monotonic_ns()
+            location = find_recording_in_s3(s3_client, bucket, prefix, initial_contact_id, ctx["initiated_at"])
             
             if location:
-                logger.info(f"Recording found in {time.time() - start_time:.1f}s")
-                break
-            
-            if attempt < 2:
-                logger.warning(f"Not found after {time.time() - start_time:.1f}s, waiting 30s...")
-                time.sleep(30)
+                logger.info("Recording found in %.1fs", (time.monotonic_ns() - start_ns) / 1e9)
         
         if not location:
-            logger.error("Recording not found after all attempts")
+            logger.error("Recording not found")
             return {"statusCode": 404, "message": "Recording not found"}
         
-        key = location["key"]
-        uri = location["uri"]
-        timestamp = location["timestamp"]
+        # An upload event may name another bucket than BASE_PATH; link and transcribe what it named
+        bucket, key = location["bucket"], location["key"]
         
     except Exception as e:
-        logger.error(f"Error searching for recording: {e}")
+        logger.error("Error searching for recording: %s", e)
         return {"statusCode": 500, "message": "Error searching for recording"}
     
-    # Transcribe recording
-    try:
-        media_s3_uri = f"s3://{bucket}/{key}"
-        logger.info(f"[TRANSCRIBE START] {media_s3_uri}")
-        
-        start_time = time.time()
-        job_name = start_transcription_job(media_s3_uri, region, DEFAULT_MODE, DEFAULT_LANGUAGE)
-        
-        job = wait_for_transcription(job_name, region)
-        status = job["TranscriptionJobStatus"]
-        elapsed = int(time.time() - start_time)
-        
-        logger.info(f"[TRANSCRIBE END] {job_name}: {status} ({elapsed}s)")
-        
-        if status != "COMPLETED":
-            raise TranscriptionError(f"Transcription failed: {status}")
-        
-        # Parse results
-        data = fetch_json(job["Transcript"]["TranscriptFileUri"], region)
-        results = data.get("results", {})
-        
-        preview = build_transcription_preview(results, DEFAULT_MODE, DEFAULT_PREVIEW_LEN)
-        duration = get_actual_recording_duration(results)
-        
-        if not preview:
-            logger.warning("Empty transcription")
-            preview = "No transcription available"
-        
-        logger.info(f"Actual duration (excluding silence): {duration:.1f}s")
-        
-    except TranscriptionError as e:
-        logger.error(f"Transcription error: {e}")
-        return {"statusCode": 502, "message": str(e)}
-    except Exception as e:
-        logger.error(f"Transcription processing error: {e}")
-        return {"statusCode": 500, "message": "Transcription processing error"}
-    
-    # Generate signed redirect URL
+    # Generate signed redirect URL (before transcribing, so misconfiguration fails fast)
     try:
         redirect_api_url = os.environ.get("REDIRECT_API_URL", "").rstrip("/")
-        signing_secret = os.environ.get("SIGNING_SECRET", "")
+        signing_secret = _SIGNING_SECRET
         
         if not redirect_api_url:
             raise ValueError("REDIRECT_API_URL environment variable not set")
@@ -941,42 +1446,125 @@ def handle_voicemail_processing(event: dict, context) -> dict:
             validity_hours
         )
         
-        logger.info(f"[SIGNED URL] Created (valid for {validity_hours} hours)")
+        logger.info("[SIGNED URL] Created (valid for %s hours)", validity_hours)
         
     except Exception as e:
-        logger.error(f"Error generating signed URL: {e}")
+        logger.error("Error generating signed URL: %s", e)
         return {"statusCode": 500, "message": "Error generating signed URL"}
     
-    # Send email
+    # Transcribe recording
     try:
-        logger.info("Sending email...")
-        response = send_email_with_recording(
-            ses_client, email_sender, email_recipient, caller_number,
-            preview, redirect_url, recipient_name, duration
-        )
+        if ctx["skip_transcription"]:
+            logger.info("[TRANSCRIBE SKIPPED] Transcription disabled for this contact")
+            preview, duration = "No transcription available", 0.0
+        else:
+            media_s3_uri = f"s3://{bucket}/{key}"
+            logger.info("[TRANSCRIBE START] %s", media_s3_uri)
+            
+            start_ns = time.monotonic_ns()
+            job_name = start_transcription_job(media_s3_uri, region, DEFAULT_MODE, DEFAULT_LANGUAGE)
+            
+            job = wait_for_transcription(job_name, region)
+            status = job["TranscriptionJobStatus"]
+            elapsed = (time.monotonic_ns() - start_ns) // 1_000_000_000
+            
+            logger.info("[TRANSCRIBE END] %s: %s (%ss)", job_name, status, elapsed)
+            
+            if status != "COMPLETED":
+                raise TranscriptionError(f"Transcription failed: {status}")
+            
+            # Parse results
+            results = fetch_transcript_results(job["Transcript"]["TranscriptFileUri"], region)
+            preview, duration = summarize_transcription(results, DEFAULT_MODE, DEFAULT_PREVIEW_LEN)
+            
+            if not preview:
+                logger.warning("Empty transcription")
+                preview = "No transcription available"
         
-        message_id = response.get("MessageId")
-        logger.info(f"[EMAIL SENT] {message_id}")
+        logger.info("Actual duration (excluding silence): %.1fs", duration)
+        
+    except TranscriptionError as e:
+        logger.error("Transcription error: %s", e)
+        return {"statusCode": 502, "message": str(e)}
+    except Exception as e:
+        logger.error("Transcription processing error: %s", e)
+        return {"statusCode": 500, "message": "Transcription processing error"}
+    
+    return send_voicemail_email(ses_client, email_sender, ctx, location, preview, redirect_url, duration)
+
+
+def send_voicemail_email(
+    ses_client, email_sender: str, ctx: dict, location: Dict[str, str],
+    preview: str, redirect_url: str, duration: float
+) -> dict:
+    """Send (or queue, when MAIL_QUEUE_URL is set) the voicemail notification and build the handler response."""
+    try:
+        mail_queue_url = os.environ.get("MAIL_QUEUE_URL")
+        if mail_queue_url:
+            logger.info("Queueing email...")
+            response = _get_client("sqs").send_message(
+                QueueUrl=mail_queue_url,
+                MessageBody=json.dumps({
+                    "region": ses_client.meta.region_name,
+                    "sender": email_sender,
+                    "recipient": ctx["email_recipient"],
+                    "caller": ctx["caller_number"],
+                    "preview": preview,
+                    "url": redirect_url,
+                    "name": ctx["recipient_name"],
+                    "duration": duration
+                })
+            )
+            message_id = response["MessageId"]
+            logger.info("[EMAIL QUEUED] %s", message_id)
+        else:
+            logger.info("Sending email...")
+            response = send_email_with_recording(
+                ses_client, email_sender, ctx["email_recipient"], ctx["caller_number"],
+                preview, redirect_url, ctx["recipient_name"], duration
+            )
+            
+            message_id = ", ".join(get_message_ids(response))
+            logger.info("[EMAIL SENT] %s", message_id)
         
         return {
             "statusCode": 200,
             "message": "Voicemail processed successfully",
             "data": {
-                "timestamp": timestamp,
-                "s3_uri": uri,
+                "timestamp": location["timestamp"],
+                "s3_uri": location["uri"],
                 "duration": duration,
                 "message_id": message_id
             }
         }
         
     except ClientError as e:
-        logger.error(f"Email send failed: {e}")
+        logger.error("Email send failed: %s", e)
         return {"statusCode": 500, "message": "Email send failed"}
     except Exception as e:
-        logger.error(f"Email error: {e}")
+        logger.error("Email error: %s", e)
         return {"statusCode": 500, "message": "Email error"}
 
 
+def handle_mail_queue(event: dict) -> dict:
+    """Send queued voicemail emails, reporting failed messages for SQS to retry."""
+    failures = []
+    
+    for record in event["Records"]:
+        try:
+            mail = json.loads(record["body"])
+            response = send_email_with_recording(
+                get_ses_client(mail["region"]), mail["sender"], mail["recipient"], mail["caller"],
+                mail["preview"], mail["url"], mail["name"], mail["duration"]
+            )
+            logger.info("[EMAIL SENT] %s", ', '.join(get_message_ids(response)))
+        except Exception as e:
+            logger.error("Email send failed for message %s: %s", record.get('messageId'), e)
+            failures.append({"itemIdentifier": record["messageId"]})
+    
+    return {"batchItemFailures": failures}
+
+
 # =============================================================================
 # MAIN HANDLER (ROUTER)
 # =============================================================================
@@ -985,26 +1573,63 @@ def lambda_handler(event: dict, context) -> dict:
     """
     Main Lambda handler that routes between:
     1. Function URL requests (URL generation/validation)
-    2. Amazon Connect events (voicemail processing)
+    2. Amazon Connect events (voicemail processing, or a fast ack when async)
+    3. Asynchronous self-invocations (background voicemail processing)
+    4. Scheduled invocations (deferred or fallback voicemail processing)
+    5. S3 recording upload events (event-driven voicemail processing)
+    6. SQS mail queue batches (email delivery)
     """
     
-    # Log the incoming event for debugging
-    logger.info(f"Event type check - Keys: {list(event.keys())}")
-    
-    # Check if this is a Function URL request (HTTP request)
-    if 'requestContext' in event and 'http' in event.get('requestContext', {}):
-        logger.info("Handling Function URL request (URL generation)")
-        return handle_url_generation(event)
-    
-    # Check if this is an Amazon Connect event
-    elif 'Details' in event and 'ContactData' in event.get('Details', {}):
-        logger.info("Handling Amazon Connect event (voicemail processing)")
-        return handle_voicemail_processing(event, context)
-    
-    # Unknown event type
-    else:
-        logger.error(f"Unknown event type. Event keys: {list(event.keys())}")
+    try:
+        # Check if this is a Function URL request (HTTP request)
+        request_context = event.get('requestContext')
+        if request_context is not None and 'http' in request_context:
+            logger.info("Handling Function URL request (URL generation)")
+            return handle_url_generation(event)
+        
+        # Check if this is an Amazon Connect event
+        details = event.get('Details')
+        if details is not None and 'ContactData' in details:
+            if os.environ.get("ASYNC_PROCESSING", "").lower() == "true":
+                logger.info("Handling Amazon Connect event (dispatching background processing)")
+                try:
+                    dispatch_voicemail_processing(event, context)
+                except Exception as e:
+                    logger.error("Failed to dispatch processing: %s", e)
+                    return {"statusCode": 500, "message": "Failed to dispatch processing"}
+                return {"statusCode": 200, "message": "accepted"}
+            
+            logger.info("Handling Amazon Connect event (voicemail processing)")
+            return handle_voicemail_processing(event, context)
+        
+        # Check if this is a background invocation dispatched for a Connect event
+        if event.get('internal') == ASYNC_PROCESS_TASK:
+            logger.info("Handling background invocation (voicemail processing)")
+            return handle_voicemail_processing(event['event'], context)
+        
+        # Check if this is an S3 upload notification or a mail queue batch
+        records = event.get('Records')
+        event_source = records[0].get('eventSource') if records else None
+        if event_source == 'aws:s3':
+            logger.info("Handling S3 event (recording uploaded)")
+            return handle_recording_uploaded(event, context)
+        if event_source == 'aws:sqs':
+            logger.info("Handling SQS batch (email delivery)")
+            return handle_mail_queue(event)
+        
+        # Check if this is a deferred processing invocation from EventBridge Scheduler
+        if event.get('source') == SCHEDULED_EVENT_SOURCE:
+            logger.info("Handling scheduled invocation (voicemail processing)")
+            return handle_scheduled_processing(event, context)
+        
+        # Unknown event type; only now are the keys worth listing
+        logger.error("Unknown event type. Event keys: %s", list(event.keys()))
         return {
             'statusCode': 400,
             'body': json.dumps({'error': 'Unknown event type'})
         }
+    
+    finally:
+        # Hand buffered log records to the runtime before the container freezes
+        if _log_buffer is not None:
+            _log_buffer.flush()